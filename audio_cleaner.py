@@ -5,23 +5,28 @@ Audio Cleaning and Enhancement Script for AI Training
 """
 
 import os
-import librosa
+import uuid
+import argparse
 import numpy as np
 import soundfile as sf
-import noisereduce as nr
-from scipy import signal
-from pydub import AudioSegment
-from pydub.silence import split_on_silence
-import glob
-from tqdm import tqdm
 import warnings
+from work_queue import LeaseQueue, LeaseLost, DEFAULT_LEASE_TTL, add_distributed_arguments
+from audio_io import list_audio_files, export_segment_flac
 warnings.filterwarnings('ignore')
 
+# المكتبات الثقيلة (librosa, noisereduce, scipy, pydub) تُستورد داخل الدوال
+# حتى لا يدفع زمن استيرادها من يستخدم --help أو عقدة لا تجد ملفات لمعالجتها
+
 class AudioCleaner:
-    def __init__(self, input_dir="downloaded_audio", output_dir="clean_audio"):
+    def __init__(self, input_dir="downloaded_audio", output_dir="clean_audio",
+                 distributed=False, worker_id=None, lease_ttl=DEFAULT_LEASE_TTL):
         self.input_dir = input_dir
         self.output_dir = output_dir
         self.create_output_dir()
+        # الوضع الموزع: عدة عقد تتشارك نفس المجلد وتحجز الملفات
+        self.queue = None
+        if distributed:
+            self.queue = LeaseQueue(os.path.join(self.output_dir, ".leases"), worker_id, lease_ttl)
         
     def create_output_dir(self):
         """إنشاء مجلد الحفظ"""
@@ -47,6 +52,8 @@ class AudioCleaner:
     
     def reduce_noise(self, audio, sr):
         """إزالة الضوضاء - Noise Reduction"""
+        import noisereduce as nr
+        
         try:
             # استخدام noisereduce لإزالة الضوضاء
             reduced_noise = nr.reduce_noise(
@@ -62,6 +69,8 @@ class AudioCleaner:
     
     def enhance_audio(self, audio, sr):
         """تحسين جودة الصوت - Audio Enhancement"""
+        import librosa
+        from scipy import signal
         
         # 1. High-pass filter لإزالة الترددات المنخفضة غير المرغوبة
         nyquist = sr // 2
@@ -89,6 +98,9 @@ class AudioCleaner:
     
     def segment_audio(self, audio_path, min_silence_len=500, silence_thresh=-40):
         """تقطيع الصوت وإزالة الصمت - Audio Segmentation"""
+        from pydub import AudioSegment
+        from pydub.silence import split_on_silence
+        
         try:
             # تحميل الملف باستخدام pydub
             audio = AudioSegment.from_wav(audio_path)
@@ -121,6 +133,9 @@ class AudioCleaner:
     
     def process_single_file(self, input_file, counter, total):
         """معالجة ملف واحد"""
+        import librosa
+        
+        temp_file = None
         try:
             print(f"\n🔄 [{counter}/{total}] معالجة: {os.path.basename(input_file)}")
             
@@ -143,21 +158,20 @@ class AudioCleaner:
             print("   ✨ تحسين جودة الصوت...")
             audio = self.enhance_audio(audio, sr)
             
-            # حفظ الملف المؤقت للتقطيع
+            # حفظ الملف المؤقت للتقطيع (WAV مؤقت يُحذف بعد التقطيع فلا داعي لترميزه)
             base_name = os.path.splitext(os.path.basename(input_file))[0]
-            temp_file = os.path.join(self.output_dir, f"temp_{base_name}.wav")
+            # اسم قصير فريد: لا يتجاوز حد طول الاسم ولا يتعارض بين العقد
+            temp_file = os.path.join(self.output_dir, f"temp_{uuid.uuid4().hex[:12]}.wav")
             sf.write(temp_file, audio, sr)
             
             # 5. تقطيع الصوت وإزالة الصمت (Audio Segmentation)
             print("   ✂️ تقطيع الصوت وإزالة الصمت...")
             segmented_audio = self.segment_audio(temp_file)
             
-            # حفظ الملف النهائي
-            output_file = os.path.join(self.output_dir, f"clean_{base_name}.wav")
-            segmented_audio.export(output_file, format="wav")
-            
-            # حذف الملف المؤقت
-            os.remove(temp_file)
+            # حفظ الملف النهائي بصيغة FLAC (فقط إذا كان الحجز ما زال لهذه العقدة)
+            output_file = os.path.join(self.output_dir, f"clean_{base_name}.flac")
+            guard = self.queue.guard(os.path.basename(input_file)) if self.queue else None
+            export_segment_flac(segmented_audio, output_file, guard=guard)
             
             # احصائيات
             final_duration = len(segmented_audio) / 1000  # pydub يستخدم milliseconds
@@ -175,45 +189,79 @@ class AudioCleaner:
                 'output_file': output_file
             }
             
+        except LeaseLost:
+            raise
         except Exception as e:
             print(f"   ❌ خطأ في معالجة الملف: {str(e)}")
             return False, None
+        finally:
+            # حذف الملف المؤقت حتى عند الفشل
+            if temp_file and os.path.exists(temp_file):
+                os.remove(temp_file)
     
     def process_all_files(self):
         """معالجة جميع الملفات"""
         print("🎵 بدء معالجة وتنظيف الملفات الصوتية")
         print("=" * 60)
         
-        # البحث عن جميع ملفات WAV
-        wav_files = glob.glob(os.path.join(self.input_dir, "*.wav"))
-        total_files = len(wav_files)
+        # البحث عن جميع الملفات الصوتية (FLAC أو WAV القديمة)
+        audio_files = list_audio_files(self.input_dir)
+        total_files = len(audio_files)
         
         if total_files == 0:
-            print("❌ لم يتم العثور على أي ملفات WAV")
+            print("❌ لم يتم العثور على أي ملفات صوتية")
             return
         
         print(f"📋 تم العثور على {total_files} ملف للمعالجة")
+        if self.queue:
+            print(f"🌐 الوضع الموزع - العقدة: {self.queue.worker_id}")
+            self.queue.start()
+            # ملفات مؤقتة تركتها عقد متوقفة
+            self.queue.sweep(self.output_dir, (".tmp_", "temp_"))
         print("=" * 60)
         
         success_count = 0
+        skipped_count = 0
         failed_files = []
         processing_stats = []
         
         # معالجة كل ملف
-        for i, wav_file in enumerate(wav_files, 1):
-            success, stats = self.process_single_file(wav_file, i, total_files)
-            
-            if success:
-                success_count += 1
-                processing_stats.append(stats)
-            else:
-                failed_files.append(os.path.basename(wav_file))
+        try:
+            for i, audio_file in enumerate(audio_files, 1):
+                key = os.path.basename(audio_file)
+                if self.queue and not self.queue.claim(key):
+                    skipped_count += 1
+                    continue
+                
+                try:
+                    success, stats = self.process_single_file(audio_file, i, total_files)
+                    if success and self.queue and not self.queue.complete(key):
+                        raise LeaseLost(key)
+                except LeaseLost:
+                    # استرجعت عقدة أخرى الملف - هي المسؤولة عنه الآن
+                    print("   ⚠️ فُقد الحجز - تم تجاهل الناتج")
+                    self.queue.release(key)
+                    skipped_count += 1
+                    continue
+                
+                if success:
+                    success_count += 1
+                    processing_stats.append(stats)
+                else:
+                    failed_files.append(key)
+                    if self.queue:
+                        self.queue.release(key)
+        finally:
+            if self.queue:
+                self.queue.close()
         
         # تقرير النتائج النهائي
         print("\n" + "=" * 60)
         print("📊 تقرير المعالجة النهائي:")
         print(f"✅ نجح: {success_count}")
         print(f"❌ فشل: {len(failed_files)}")
+        if self.queue:
+            print(f"⏭️ تمت معالجتها أو محجوزة من عقد أخرى: {skipped_count}")
         print(f"📁 الملفات المنظفة محفوظة في: {os.path.abspath(self.output_dir)}")
         
         if processing_stats:
@@ -233,7 +281,12 @@ class AudioCleaner:
 
 def main():
     """الدالة الرئيسية"""
-    cleaner = AudioCleaner()
+    parser = argparse.ArgumentParser(description="تنظيف الملفات الصوتية")
+    add_distributed_arguments(parser)
+    args = parser.parse_args()
+    
+    cleaner = AudioCleaner(distributed=args.distributed, worker_id=args.worker_id,
+                           lease_ttl=args.lease_ttl)
     cleaner.process_all_files()
 
 if __name__ == "__main__":
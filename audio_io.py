@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Lossless FLAC Audio Storage Helpers
+أدوات حفظ وقراءة الصوت بصيغة FLAC المضغوطة بدون فقدان
+"""
+
+import os
+import glob
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from work_queue import atomic_output
+
+AUDIO_EXTENSIONS = (".flac", ".wav")  # FLAC أولاً، WAV للملفات القديمة
+# صيغ WAV التي يمكن حفظها في FLAC بدون فقدان (FLAC لا يدعم float أو 32-bit)
+LOSSLESS_FLAC_SUBTYPES = {'PCM_U8': 'PCM_S8', 'PCM_S8': 'PCM_S8', 'PCM_16': 'PCM_16', 'PCM_24': 'PCM_24'}
+CONVERT_BLOCK_FRAMES = 1 << 20
+
+# numpy و soundfile تُستورد داخل الدوال: list_audio_files تُستخدم في أوامر خفيفة مثل status
+
+
+def list_audio_files(directory, prefix=""):
+    """جميع الملفات الصوتية في المجلد، مع تفضيل FLAC على WAV لنفس الاسم"""
+    by_stem = {}
+    for ext in reversed(AUDIO_EXTENSIONS):
+        for path in glob.glob(os.path.join(directory, f"{prefix}*{ext}")):
+            by_stem[os.path.splitext(path)[0]] = path
+    return sorted(by_stem.values())
+
+
+def write_flac(path, audio, sr, subtype='PCM_16', guard=None):
+    """حفظ مصفوفة صوتية كـ FLAC بشكل ذري"""
+    import soundfile as sf
+    
+    with atomic_output(path, guard) as temp_path:
+        sf.write(temp_path, audio, sr, subtype=subtype, format='FLAC')
+    return path
+
+
+def export_segment_flac(segment, path, guard=None):
+    """حفظ AudioSegment من pydub كـ FLAC مباشرة عبر libsndfile (بدون ffmpeg)"""
+    import numpy as np
+    
+    if segment.sample_width <= 2:
+        segment, subtype = segment.set_sample_width(2), 'PCM_16'
+    else:
+        # FLAC لا يدعم 32-bit؛ libsndfile يحول int32 إلى 24-bit
+        segment, subtype = segment.set_sample_width(4), 'PCM_24'
+    samples = np.array(segment.get_array_of_samples()).reshape(-1, segment.channels)
+    return write_flac(path, samples, segment.frame_rate, subtype=subtype, guard=guard)
+
+
+def read_clip(path, start, end, dtype='float32'):
+    """
+    قراءة مقطع (بالثواني) بدون فك ترميز الملف كاملاً.
+    FLAC يدعم البحث على مستوى الإطار، فيُقرأ المقطع المطلوب فقط.
+    """
+    import soundfile as sf
+    
+    with sf.SoundFile(path) as f:
+        start_frame = max(int(round(start * f.samplerate)), 0)
+        end_frame = min(int(round(end * f.samplerate)), f.frames)
+        f.seek(start_frame)
+        audio = f.read(max(end_frame - start_frame, 0), dtype=dtype)
+        return audio, f.samplerate
+
+
+def same_samples(path_a, path_b, dtype='int32', blocksize=CONVERT_BLOCK_FRAMES):
+    """مقارنة العينات المفكوكة من ملفين كتلة بكتلة (بدون تحميل الملف كاملاً)"""
+    import numpy as np
+    import soundfile as sf
+    
+    with sf.SoundFile(path_a) as a, sf.SoundFile(path_b) as b:
+        if (a.frames, a.channels, a.samplerate) != (b.frames, b.channels, b.samplerate):
+            return False
+        while True:
+            block_a = a.read(blocksize, dtype=dtype, always_2d=True)
+            block_b = b.read(blocksize, dtype=dtype, always_2d=True)
+            if not np.array_equal(block_a, block_b):
+                return False
+            if len(block_a) == 0:
+                return True
+
+
+def convert_to_flac(wav_path, remove_source=True):
+    """
+    تحويل ملف WAV إلى FLAC بنفس الدقة.
+    الصيغ التي لا يحفظها FLAC بدون فقدان تُترك كما هي، ولا يُحذف المصدر
+    إلا بعد فك ترميز FLAC والتأكد من تطابقه التام مع WAV.
+    """
+    import soundfile as sf
+    
+    info = sf.info(wav_path)
+    subtype = LOSSLESS_FLAC_SUBTYPES.get(info.subtype)
+    if subtype is None:
+        raise ValueError(f"صيغة {info.subtype} لا تُحفظ في FLAC بدون فقدان - تم الإبقاء على WAV")
+    
+    dtype = 'int32' if subtype == 'PCM_24' else 'int16'
+    flac_path = os.path.splitext(wav_path)[0] + ".flac"
+    with atomic_output(flac_path) as temp_path:
+        with sf.SoundFile(temp_path, 'w', info.samplerate, info.channels, subtype, format='FLAC') as out:
+            for block in sf.blocks(wav_path, blocksize=CONVERT_BLOCK_FRAMES, dtype=dtype, always_2d=True):
+                out.write(block)
+        # التحقق قبل إعادة التسمية: لا يظهر ملف FLAC مختلف عن المصدر
+        if not same_samples(wav_path, temp_path, dtype):
+            raise ValueError("FLAC الناتج لا يطابق WAV الأصلي - تم الإبقاء على WAV")
+    
+    if remove_source:
+        os.remove(wav_path)
+    return flac_path
+
+
+def convert_directory(directory, workers=None, remove_source=True):
+    """تحويل جميع ملفات WAV في المجلد إلى FLAC بالتوازي"""
+    wav_files = sorted(glob.glob(os.path.join(directory, "*.wav")))
+    if not wav_files:
+        print(f"❌ لم يتم العثور على ملفات WAV في {directory}")
+        return []
+
+    print(f"🗜️ تحويل {len(wav_files)} ملف إلى FLAC في: {directory}")
+    converted = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(convert_to_flac, path, remove_source): path for path in wav_files}
+        for future in as_completed(futures):
+            try:
+                converted.append(future.result())
+                print(f"   ✅ {os.path.basename(futures[future])}")
+            except Exception as e:
+                print(f"   ❌ {os.path.basename(futures[future])}: {e}")
+    return converted
+
+
+def main():
+    """تحويل المجلدات الموجودة من WAV إلى FLAC"""
+    parser = argparse.ArgumentParser(description="تحويل ملفات WAV الموجودة إلى FLAC")
+    parser.add_argument("directories", nargs="*",
+                        default=["downloaded_audio", "clean_audio", "renamed_audio"])
+    parser.add_argument("--workers", type=int, default=None, help="عدد العمليات المتوازية")
+    parser.add_argument("--keep-wav", action="store_true", help="الإبقاء على ملفات WAV الأصلية")
+    args = parser.parse_args()
+
+    for directory in args.directories:
+        if os.path.isdir(directory):
+            convert_directory(directory, args.workers, remove_source=not args.keep_wav)
+
+
+if __name__ == "__main__":
+    main()
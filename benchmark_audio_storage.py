@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+WAV vs FLAC Storage Benchmark
+مقارنة حجم التخزين وزمن القراءة والكتابة بين WAV و FLAC
+"""
+
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import numpy as np
+import soundfile as sf
+from audio_io import read_clip, same_samples
+
+BLOCK_SECONDS = 10  # التوليد والكتابة على كتل حتى يبقى استهلاك الذاكرة ثابتاً
+
+
+def synthesize_blocks(minutes, sr=44100, seed=0):
+    """
+    توليد إشارة تشبه التلاوة على كتل: نغمات متغيرة مع فترات صمت وضوضاء خفيفة.
+    الطور يُحمل بين الكتل فتبقى الإشارة متصلة.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(minutes * 60 * sr)
+    block = BLOCK_SECONDS * sr
+    phase_offset = 0.0
+    for start in range(0, total, block):
+        t = np.arange(start, min(start + block, total)) / sr
+        pitch = 140 + 40 * np.sin(2 * np.pi * 0.2 * t)  # Hz
+        phase = phase_offset + 2 * np.pi * np.cumsum(pitch) / sr
+        phase_offset = phase[-1]
+        voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+        envelope = (np.sin(2 * np.pi * 0.15 * t) > -0.3).astype(np.float64)  # فترات صمت بين الآيات
+        audio = 0.25 * voice * envelope + 0.003 * rng.standard_normal(len(t))
+        yield (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+
+
+def write_synthetic(path, minutes, sr, file_format):
+    """كتابة التسجيل الاصطناعي كتلة بكتلة"""
+    with sf.SoundFile(path, 'w', sr, 1, 'PCM_16', format=file_format) as f:
+        for block in synthesize_blocks(minutes, sr):
+            f.write(block)
+
+
+def evict_from_cache(path):
+    """
+    إخراج الملف من page cache حتى تقيس القراءة التالية القرص أو NFS فعلاً.
+    ترجع False إذا لم يكن posix_fadvise متاحاً.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)  # الصفحات المتسخة لا يمكن إخراجها
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+    return True
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def read_all(path):
+    """فك ترميز الملف كاملاً كتلة بكتلة"""
+    for _ in sf.blocks(path, blocksize=BLOCK_SECONDS * sf.info(path).samplerate, dtype='int16'):
+        pass
+
+
+def random_clips(path, duration, count, clip_seconds, seed=1):
+    """قراءة مقاطع عشوائية (مثل قص الآيات) من الملف"""
+    rng = np.random.default_rng(seed)
+    for start in rng.uniform(0, max(duration - clip_seconds, 0), count):
+        read_clip(path, start, start + clip_seconds)
+
+
+def run_benchmark(minutes, work_dir, clips, clip_seconds, sr=44100):
+    """ترجع (المدة، النتائج، هل تم إخراج الملفات من page cache قبل القراءة)"""
+    duration = int(minutes * 60 * sr) / sr
+    paths = {"WAV": os.path.join(work_dir, "bench.wav"), "FLAC": os.path.join(work_dir, "bench.flac")}
+
+    results = {}
+    evicted = True
+    for name, path in paths.items():
+        _, write_time = timed(write_synthetic, path, minutes, sr, name)
+        evicted &= evict_from_cache(path)
+        _, read_time = timed(read_all, path)
+        evicted &= evict_from_cache(path)
+        _, clip_time = timed(random_clips, path, duration, clips, clip_seconds)
+        results[name] = {
+            "size_mb": os.path.getsize(path) / 1e6,
+            "write_s": write_time,
+            "read_s": read_time,
+            "clips_s": clip_time,
+        }
+
+    assert same_samples(paths["WAV"], paths["FLAC"], dtype='int16'), "FLAC ليس بدون فقدان"
+    return duration, results, evicted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="مقارنة WAV و FLAC")
+    parser.add_argument("--minutes", type=float, default=40, help="مدة التسجيل الاصطناعي")
+    parser.add_argument("--dir", default=None,
+                        help="مجلد الاختبار (مثلاً مجلد NFS المشترك لقياس عرض النطاق الفعلي)")
+    parser.add_argument("--clips", type=int, default=200, help="عدد المقاطع العشوائية")
+    parser.add_argument("--clip-seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="audio_bench_", dir=args.dir)
+    try:
+        print(f"🎵 إنشاء تسجيل بمدة {args.minutes:g} دقيقة في: {work_dir}")
+        duration, results, evicted = run_benchmark(args.minutes, work_dir, args.clips, args.clip_seconds)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("=" * 60)
+    print(f"{'':6} {'MB':>9} {'write s':>9} {'read s':>9} {f'{args.clips} clips s':>14}")
+    for name, r in results.items():
+        print(f"{name:6} {r['size_mb']:9.1f} {r['write_s']:9.2f} {r['read_s']:9.2f} {r['clips_s']:14.3f}")
+    ratio = results["FLAC"]["size_mb"] / results["WAV"]["size_mb"]
+    print("=" * 60)
+    print(f"📉 حجم FLAC = {ratio * 100:.1f}% من WAV (المدة {duration / 60:.1f} دقيقة)")
+    if evicted:
+        print("🧊 القراءة بعد إخراج الملف من page cache (posix_fadvise DONTNEED)")
+    else:
+        print("⚠️ posix_fadvise غير متاح: أزمنة القراءة من page cache ولا تمثل القرص أو NFS")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+CLI Startup Time Check (python -X importtime)
+فحص زمن بدء الأوامر الخفيفة والتأكد من عدم استيراد المكتبات الثقيلة
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ("torch", "whisper", "librosa", "noisereduce", "scipy", "pydub",
+                 "docx", "yt_dlp", "numpy", "soundfile")
+
+
+def parse_importtime(stderr):
+    """تحليل مخرجات -X importtime: {اسم الوحدة: الزمن الذاتي بالميكروثانية}"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(self_us)
+    return modules
+
+
+def check_command(cli_args):
+    """تشغيل أمر واحد وإرجاع (الزمن الكلي للاستيراد، الوحدات الثقيلة المستوردة)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.join(ROOT_DIR, "cli.py"), *cli_args],
+        cwd=ROOT_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"فشل الأمر {' '.join(cli_args)}:\n{result.stderr[-2000:]}")
+    modules = parse_importtime(result.stderr)
+    total_ms = sum(modules.values()) / 1000
+    heavy = sorted({name.split(".")[0] for name in modules} & set(HEAVY_MODULES))
+    return total_ms, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="فحص زمن بدء أوامر cli.py الخفيفة")
+    parser.add_argument("--budget-ms", type=float, default=1000, help="الحد الأقصى لزمن الاستيراد")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        commands = [
+            ["--help"],
+            ["status"],
+            ["strip-basmalah", "--input-dir", work_dir, "--output-dir", os.path.join(work_dir, "out")],
+            ["clean", "--help"],
+            ["transcribe", "--help"],
+            ["download", "--help"],
+        ]
+
+        failures = 0
+        for cli_args in commands:
+            total_ms, heavy = check_command(cli_args)
+            ok = total_ms <= args.budget_ms and not heavy
+            failures += not ok
+            status = "✅" if ok else "❌"
+            label = " ".join(cli_args) if cli_args[-1] == "--help" else cli_args[0]
+            print(f"{status} {label:24} {total_ms:8.1f} ms"
+                  + (f"   مكتبات ثقيلة: {', '.join(heavy)}" if heavy else ""))
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
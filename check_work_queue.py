@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Multi-process Work Queue Check
+فحص طابور العمل الموزع بعدة عمليات محلياً: كل عنصر يُنجز مرة واحدة فقط،
+والحجوزات المنتهية تُسترجع، والعقدة التي فقدت حجزها لا تكتب ناتجها
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing
+from work_queue import LeaseQueue, LeaseLost, atomic_write_json, sweep_orphans, TEMP_PREFIX
+
+
+def worker(root, keys, lease_ttl):
+    """عقدة واحدة: تحجز ما تستطيع من العناصر وتسجل ما أنجزته"""
+    queue = LeaseQueue(os.path.join(root, ".leases"), lease_ttl=lease_ttl)
+    with queue:
+        for key in keys:
+            if not queue.claim(key):
+                continue
+            time.sleep(0.01)  # محاكاة المعالجة
+            atomic_write_json(os.path.join(root, f"{key}.json"), {"worker": queue.worker_id},
+                              guard=queue.guard(key))
+            if queue.complete(key):
+                # O_APPEND: سطر كامل لكل كتابة حتى مع عدة عمليات
+                with open(os.path.join(root, "completed.log"), 'a', encoding='utf-8') as f:
+                    f.write(f"{key}\n")
+
+
+def crashed_worker(lease_dir, lease_ttl):
+    """عقدة تحجز عنصراً ثم تتوقف فجأة بدون تحرير الحجز"""
+    LeaseQueue(lease_dir, worker_id="crashed", lease_ttl=lease_ttl).claim("x")
+    os._exit(0)
+
+
+def check_exactly_once(root, workers, keys, lease_ttl):
+    """N عمليات على M عنصر: كل عنصر يُنجز مرة واحدة بالضبط"""
+    all_keys = [f"item{i:04d}" for i in range(keys)]
+    processes = [multiprocessing.Process(target=worker, args=(root, all_keys, lease_ttl))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    with open(os.path.join(root, "completed.log"), 'r', encoding='utf-8') as f:
+        completed = f.read().split()
+    lease_dir = os.path.join(root, ".leases")
+    done = [name for name in os.listdir(lease_dir) if name.endswith(".done")]
+    leftover = [name for name in os.listdir(lease_dir) if not name.endswith(".done")]
+
+    assert sorted(completed) == all_keys, \
+        f"مكرر: {len(completed) - len(set(completed))}، مفقود: {len(set(all_keys) - set(completed))}"
+    assert len(done) == keys, f"{len(done)} ملف .done من أصل {keys}"
+    assert not leftover, f"ملفات متبقية في مجلد الحجز: {leftover[:5]}"
+    assert all(os.path.exists(os.path.join(root, f"{key}.json")) for key in all_keys)
+
+
+def check_reclaim(root, lease_ttl):
+    """استرجاع حجز عقدة متوقفة، وحماية حجز عقدة حية، وإهمال ناتج عقدة فقدت حجزها"""
+    lease_dir = os.path.join(root, ".leases")
+
+    # 1. عقدة تتوقف بعد الحجز: لا يمكن استرجاعه قبل انتهاء المدة، ثم يُسترجع
+    process = multiprocessing.Process(target=crashed_worker, args=(lease_dir, lease_ttl))
+    process.start()
+    process.join()
+    survivor = LeaseQueue(lease_dir, worker_id="survivor", lease_ttl=lease_ttl)
+    assert not survivor.claim("x"), "استُرجع الحجز قبل انتهاء مدته"
+    time.sleep(lease_ttl * 1.2)
+    assert survivor.claim("x"), "لم يُسترجع الحجز المنتهي"
+    assert survivor.complete("x")
+
+    # 2. عقدة حية تجدد حجزها لا يُسترجع منها حتى بعد تجاوز المدة
+    with LeaseQueue(lease_dir, worker_id="alive", lease_ttl=lease_ttl) as alive:
+        assert alive.claim("z")
+        time.sleep(lease_ttl * 2)
+        assert not survivor.claim("z"), "استُرجع حجز عقدة حية تجدد حجزها"
+        assert alive.complete("z")
+
+    # 3. عقدة بطيئة لم تجدد حجزها: بعد الاسترجاع لا تكتب الناتج ولا .done
+    slow = LeaseQueue(lease_dir, worker_id="slow", lease_ttl=lease_ttl)
+    fast = LeaseQueue(lease_dir, worker_id="fast", lease_ttl=lease_ttl)
+    assert slow.claim("y")
+    time.sleep(lease_ttl * 1.2)
+    assert fast.claim("y")
+    assert not slow.owns("y")
+    output = os.path.join(root, "y.json")
+    try:
+        atomic_write_json(output, {"worker": "slow"}, guard=slow.guard("y"))
+        raise AssertionError("كتبت العقدة البطيئة ناتجها بعد فقد الحجز")
+    except LeaseLost:
+        pass
+    assert not os.path.exists(output)
+    assert not slow.complete("y"), "كتبت العقدة البطيئة .done بعد فقد الحجز"
+    assert not fast.is_done("y")
+    assert fast.complete("y")
+
+    # 4. الملفات المؤقتة المتروكة الأقدم من المدة تُحذف، والحديثة تبقى
+    old_temp = os.path.join(root, f"{TEMP_PREFIX}orphan_a.json")
+    new_temp = os.path.join(root, f"{TEMP_PREFIX}inuse_b.json")
+    for path in (old_temp, new_temp):
+        open(path, 'w').close()
+    os.utime(old_temp, (time.time() - lease_ttl * 2,) * 2)
+    sweep_orphans(root, max_age=lease_ttl)
+    assert not os.path.exists(old_temp) and os.path.exists(new_temp)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="فحص طابور العمل الموزع بعدة عمليات")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--keys", type=int, default=200)
+    parser.add_argument("--lease-ttl", type=float, default=1.0, help="مدة قصيرة لاختبار الاسترجاع")
+    parser.add_argument("--dir", default=None, help="مجلد الاختبار (مثلاً مجلد NFS المشترك)")
+    args = parser.parse_args()
+
+    checks = [
+        (f"{args.workers} عمليات × {args.keys} عنصر - إنجاز مرة واحدة",
+         lambda root: check_exactly_once(root, args.workers, args.keys, args.lease_ttl)),
+        ("استرجاع الحجز المنتهي وإهمال ناتج الحجز المفقود",
+         lambda root: check_reclaim(root, args.lease_ttl)),
+    ]
+
+    failures = 0
+    for name, check in checks:
+        with tempfile.TemporaryDirectory(prefix="work_queue_check_", dir=args.dir) as root:
+            try:
+                check(root)
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failures += 1
+                print(f"❌ {name}: {e}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Juz Amma Dataset Pipeline - Unified Command Line
+واجهة موحدة لجميع مراحل بناء مجموعة بيانات جزء عم
+
+كل أمر يستورد مكتباته الثقيلة (whisper/torch, librosa, yt_dlp ...) عند تشغيله فقط،
+لذلك تبقى أوامر مثل --help و status و strip-basmalah سريعة البدء.
+"""
+
+import os
+import sys
+import argparse
+from work_queue import add_distributed_arguments, lease_status, DEFAULT_LEASE_TTL
+
+
+def cmd_download(args):
+    """تنزيل الصوتيات من يوتيوب"""
+    import download_quran_audio
+    download_quran_audio.main(docx_file=args.docx, output_dir=args.output_dir)
+
+
+def cmd_clean(args):
+    """تنظيف وتحسين الصوت"""
+    from audio_cleaner import AudioCleaner
+    cleaner = AudioCleaner(args.input_dir, args.output_dir, distributed=args.distributed,
+                           worker_id=args.worker_id, lease_ttl=args.lease_ttl)
+    cleaner.process_all_files()
+
+
+def cmd_transcribe(args):
+    """استخراج النصوص باستخدام Whisper"""
+    from whisper_transcriber import WhisperTranscriber
+    transcriber = WhisperTranscriber(args.input_dir, args.output_dir, distributed=args.distributed,
+                                     worker_id=args.worker_id, lease_ttl=args.lease_ttl)
+    transcriber.process_all_files()
+
+
+def cmd_strip_basmalah(args):
+    """إزالة البسملة من بداية كل سورة"""
+    import simple_basmalah_cleaner
+    simple_basmalah_cleaner.main(input_dir=args.input_dir, output_dir=args.output_dir)
+
+
+def cmd_status(args):
+    """عرض حالة كل مرحلة (عدد الملفات والحجوزات)"""
+    from audio_io import list_audio_files
+
+    def count(directory, suffix):
+        if not os.path.isdir(directory):
+            return 0
+        return sum(1 for name in os.listdir(directory) if name.endswith(suffix) and not name.startswith("."))
+
+    stages = [
+        ("downloaded_audio", len(list_audio_files("downloaded_audio")), None),
+        ("clean_audio", len(list_audio_files("clean_audio", prefix="clean_")), "clean_audio"),
+        ("renamed_audio", len(list_audio_files("renamed_audio")), None),
+        ("transcripts", count("transcripts", ".json"), "transcripts"),
+        ("simple_clean_surahs", count("simple_clean_surahs", ".json"), None),
+    ]
+
+    print("📊 حالة مجموعة البيانات")
+    print("=" * 60)
+    for directory, files, lease_owner_dir in stages:
+        line = f"{directory:22} {files:5} ملف"
+        if lease_owner_dir:
+            leases = lease_status(os.path.join(lease_owner_dir, ".leases"), args.lease_ttl)
+            if any(leases.values()):
+                line += (f"   🌐 مكتمل: {leases['done']}  نشط: {leases['active']}"
+                         f"  منتهي: {leases['expired']}")
+        print(line)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="cli.py",
+        description="بناء مجموعة بيانات جزء عم: تنزيل، تنظيف، ترانسكربت، وإزالة البسملة"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    download = subparsers.add_parser("download", help="تنزيل الصوتيات من يوتيوب وتحويلها إلى FLAC")
+    download.add_argument("--docx", default="youtube_dataset.docx", help="ملف الوورد الذي يحتوي الروابط")
+    download.add_argument("--output-dir", default="downloaded_audio")
+    download.set_defaults(func=cmd_download)
+
+    clean = subparsers.add_parser("clean", help="إزالة الضوضاء وتطبيع الصوت")
+    clean.add_argument("--input-dir", default="downloaded_audio")
+    clean.add_argument("--output-dir", default="clean_audio")
+    add_distributed_arguments(clean)
+    clean.set_defaults(func=cmd_clean)
+
+    transcribe = subparsers.add_parser("transcribe", help="ترانسكربت مع timestamps لكل كلمة")
+    transcribe.add_argument("--input-dir", default="clean_audio")
+    transcribe.add_argument("--output-dir", default="transcripts")
+    add_distributed_arguments(transcribe)
+    transcribe.set_defaults(func=cmd_transcribe)
+
+    strip = subparsers.add_parser("strip-basmalah", help="إزالة البسملة من ملفات السور JSON")
+    strip.add_argument("--input-dir", default="juz_amma_surahs")
+    strip.add_argument("--output-dir", default="simple_clean_surahs")
+    strip.set_defaults(func=cmd_strip_basmalah)
+
+    status = subparsers.add_parser("status", help="عرض حالة كل مرحلة")
+    status.add_argument("--lease-ttl", type=float, default=DEFAULT_LEASE_TTL,
+                        help="مدة صلاحية الحجز لتمييز الحجوزات المنتهية")
+    status.set_defaults(func=cmd_status)
+
+    return parser
+
+
+def main(argv=None):
+    """الدالة الرئيسية"""
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,19 @@
 #!/usr/bin/env python3
 """
-تنزيل التسجيلات الصوتية من يوتيوب وتحويلها إلى ملفات WAV
-YouTube Audio Downloader and WAV Converter
+تنزيل التسجيلات الصوتية من يوتيوب وتحويلها إلى ملفات FLAC
+YouTube Audio Downloader and FLAC Converter
 """
 
 import os
 import sys
-import docx
-import yt_dlp
-from pydub import AudioSegment
 import re
 import time
+from audio_io import export_segment_flac
 
 def extract_urls_from_docx(docx_path):
     """استخراج الروابط من ملف الوورد"""
+    import docx
+    
     doc = docx.Document(docx_path)
     urls = []
     for paragraph in doc.paragraphs:
@@ -29,7 +29,10 @@ def sanitize_filename(filename):
     return filename[:200]  # تحديد طول الاسم
 
 def download_and_convert_to_wav(url, output_dir="downloaded_audio", counter=1, total=1):
-    """تنزيل الفيديو وتحويله إلى WAV"""
+    """تنزيل الفيديو وتحويله إلى FLAC (صوت بدون فقدان بحجم أصغر من WAV)"""
+    import yt_dlp
+    from pydub import AudioSegment
+    
     try:
         # إعدادات yt-dlp
         ydl_opts = {
@@ -68,23 +71,23 @@ def download_and_convert_to_wav(url, output_dir="downloaded_audio", counter=1, t
                 downloaded_file = downloaded_files[0]
                 file_path = os.path.join(output_dir, downloaded_file)
                 
-                # تحويل إلى WAV
-                wav_filename = f"{video_id}_{sanitize_filename(video_title)}.wav"
-                wav_path = os.path.join(output_dir, wav_filename)
+                # تحويل إلى FLAC
+                flac_filename = f"{video_id}_{sanitize_filename(video_title)}.flac"
+                flac_path = os.path.join(output_dir, flac_filename)
                 
-                print(f"تحويل إلى WAV: {wav_filename}")
+                print(f"تحويل إلى FLAC: {flac_filename}")
                 
                 # تحميل وتحويل الصوت
                 audio = AudioSegment.from_file(file_path)
-                audio.export(wav_path, format="wav")
+                export_segment_flac(audio, flac_path)
                 
                 # حذف الملف الأصلي
                 os.remove(file_path)
                 
                 print(f"✅ تم الانتهاء من: {video_title}")
-                print(f"📁 حُفظ في: {wav_path}\n")
+                print(f"📁 حُفظ في: {flac_path}\n")
                 
-                return True, wav_filename
+                return True, flac_filename
             else:
                 print(f"❌ لم يتم العثور على الملف المنزل لـ: {video_title}")
                 return False, None
@@ -93,17 +96,15 @@ def download_and_convert_to_wav(url, output_dir="downloaded_audio", counter=1, t
         print(f"❌ خطأ في تنزيل {url}: {str(e)}")
         return False, None
 
-def main():
+def main(docx_file="youtube_dataset.docx", output_dir="downloaded_audio"):
     """الدالة الرئيسية"""
-    print("🎵 برنامج تنزيل التسجيلات الصوتية من يوتيوب وتحويلها إلى WAV")
+    print("🎵 برنامج تنزيل التسجيلات الصوتية من يوتيوب وتحويلها إلى FLAC")
     print("=" * 60)
     
     # إنشاء مجلد الحفظ
-    output_dir = "downloaded_audio"
     os.makedirs(output_dir, exist_ok=True)
     
     # استخراج الروابط من ملف الوورد
-    docx_file = "youtube_dataset.docx"
     if not os.path.exists(docx_file):
         print(f"❌ لم يتم العثور على ملف: {docx_file}")
         return
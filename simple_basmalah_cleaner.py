@@ -8,10 +8,7 @@ import json
 import os
 import glob
 
-def main():
-    input_dir = "juz_amma_surahs" 
-    output_dir = "simple_clean_surahs"
-    
+def main(input_dir="juz_amma_surahs", output_dir="simple_clean_surahs"):
     # إنشاء مجلد الإخراج
     os.makedirs(output_dir, exist_ok=True)
     print(f"📁 تم إنشاء مجلد: {output_dir}")
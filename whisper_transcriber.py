@@ -5,21 +5,30 @@ Whisper Large-v3 Transcription Script with Word-level Timestamps
 """
 
 import os
-import whisper
 import json
-import glob
+import argparse
 import shutil
 from datetime import datetime
 import warnings
+from work_queue import (LeaseQueue, LeaseLost, atomic_output, atomic_write_json, exclusive_lock,
+                        DEFAULT_LEASE_TTL, add_distributed_arguments)
+from audio_io import list_audio_files
 warnings.filterwarnings('ignore')
 
 class WhisperTranscriber:
-    def __init__(self, input_dir="clean_audio", output_dir="transcripts"):
+    def __init__(self, input_dir="clean_audio", output_dir="transcripts",
+                 distributed=False, worker_id=None, lease_ttl=DEFAULT_LEASE_TTL):
         self.input_dir = input_dir
         self.output_dir = output_dir
         self.renamed_dir = "renamed_audio"
+        self.manifest_path = os.path.join(self.renamed_dir, "manifest.json")
+        self.lease_ttl = lease_ttl
         self.model = None
         self.create_directories()
+        # الوضع الموزع: عدة عقد تتشارك نفس المجلد وتحجز الملفات
+        self.queue = None
+        if distributed:
+            self.queue = LeaseQueue(os.path.join(self.output_dir, ".leases"), worker_id, lease_ttl)
         
     def create_directories(self):
         """إنشاء المجلدات المطلوبة"""
@@ -32,6 +41,7 @@ class WhisperTranscriber:
         """تحميل نموذج Whisper Large-v3"""
         print("🤖 تحميل نموذج Whisper Large-v3...")
         try:
+            import whisper  # torch يُستورد هنا فقط (عدة ثوانٍ)
             self.model = whisper.load_model("large-v3")
             print("✅ تم تحميل النموذج بنجاح")
             return True
@@ -39,27 +49,61 @@ class WhisperTranscriber:
             print(f"❌ خطأ في تحميل النموذج: {e}")
             return False
     
+    def plan_renames(self):
+        """
+        تحديد الاسم الجديد لكل ملف نظيف (عينة 1، عينة 2، إلخ).
+        الأرقام محفوظة في manifest.json: الملف يحتفظ برقمه دائماً والملفات الجديدة
+        تأخذ الرقم التالي، فيبقى الترقيم ثابتاً بين العقد وبين التشغيلات.
+        """
+        # العثور على جميع الملفات النظيفة (FLAC أو WAV القديمة) بترتيب أبجدي
+        # المفتاح بدون الامتداد حتى لا يتغير الرقم عند تحويل WAV إلى FLAC
+        clean_files = {os.path.splitext(os.path.basename(path))[0]: path
+                       for path in list_audio_files(self.input_dir, prefix="clean_")}
+        
+        with exclusive_lock(f"{self.manifest_path}.lock", stale_after=self.lease_ttl):
+            samples = {}
+            if os.path.exists(self.manifest_path):
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    samples = json.load(f)["samples"]
+            
+            new_stems = [stem for stem in sorted(clean_files) if stem not in samples]
+            for number, stem in enumerate(new_stems, max(samples.values(), default=0) + 1):
+                samples[stem] = number
+            if new_stems:
+                atomic_write_json(self.manifest_path, {"samples": samples})
+        
+        return [(path, f"عينة {samples[stem]}{os.path.splitext(path)[1]}")
+                for stem, path in sorted(clean_files.items(), key=lambda item: samples[item[0]])]
+    
+    def copy_renamed(self, old_file, new_name, guard=None):
+        """ربط الملف بالاسم الجديد (hard link بدل نسخة كاملة) بشكل ذري"""
+        new_path = os.path.join(self.renamed_dir, new_name)
+        with atomic_output(new_path, guard) as temp_path:
+            try:
+                os.link(old_file, temp_path)
+                # الرابط يحمل mtime الملف القديم؛ نحدثه حتى لا تحذفه sweep في عقدة أخرى
+                os.utime(temp_path)
+            except OSError:
+                # نظام ملفات لا يدعم الروابط أو مجلدات على أجهزة مختلفة
+                shutil.copy2(old_file, temp_path)
+        return new_path
+    
     def rename_audio_files(self):
         """إعادة تسمية الملفات الصوتية إلى عينة 1، عينة 2، إلخ"""
         print("📝 بدء إعادة تسمية الملفات...")
         
-        # العثور على جميع ملفات WAV النظيفة
-        clean_files = glob.glob(os.path.join(self.input_dir, "clean_*.wav"))
-        clean_files.sort()  # ترتيب أبجدي
+        planned = self.plan_renames()
         
-        if not clean_files:
+        if not planned:
             print("❌ لم يتم العثور على ملفات صوتية نظيفة")
             return []
         
         renamed_files = []
         
-        for i, old_file in enumerate(clean_files, 1):
-            new_name = f"عينة {i}.wav"
-            new_path = os.path.join(self.renamed_dir, new_name)
-            
+        for old_file, new_name in planned:
             # نسخ الملف بالاسم الجديد
-            shutil.copy2(old_file, new_path)
-            renamed_files.append((new_path, new_name))
+            self.copy_renamed(old_file, new_name)
+            renamed_files.append((old_file, new_name))
             
             print(f"   ✅ {os.path.basename(old_file)} → {new_name}")
         
@@ -124,19 +168,20 @@ class WhisperTranscriber:
             print(f"   ❌ خطأ في الترانسكربت: {e}")
             return None
     
-    def save_transcript_json(self, transcript_data, sample_name):
+    def save_transcript_json(self, transcript_data, sample_name, guard=None):
         """حفظ ترانسكربت كملف JSON"""
-        base_name = os.path.splitext(sample_name)[0]  # إزالة امتداد .wav
+        base_name = os.path.splitext(sample_name)[0]  # إزالة امتداد الملف الصوتي
         json_filename = f"{base_name}.json"
         json_path = os.path.join(self.output_dir, json_filename)
         
         try:
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(transcript_data, f, ensure_ascii=False, indent=2)
+            atomic_write_json(json_path, transcript_data, guard)
             
             print(f"   💾 تم حفظ الترانسكربت: {json_filename}")
             return json_path
             
+        except LeaseLost:
+            raise
         except Exception as e:
             print(f"   ❌ خطأ في حفظ الملف: {e}")
             return None
@@ -146,32 +191,79 @@ class WhisperTranscriber:
         print("🎵 بدء نظام الترانسكربت الشامل")
         print("=" * 60)
         
-        # 1. تحميل نموذج Whisper
-        if not self.load_whisper_model():
-            return
-        
-        # 2. إعادة تسمية الملفات
-        renamed_files = self.rename_audio_files()
-        if not renamed_files:
-            return
+        if self.queue:
+            # في الوضع الموزع تُنسخ الملفات ويُحمّل النموذج عند أول حجز ناجح فقط
+            print(f"🌐 الوضع الموزع - العقدة: {self.queue.worker_id}")
+            work_items = self.plan_renames()
+            if not work_items:
+                print("❌ لم يتم العثور على ملفات صوتية نظيفة")
+                return
+            self.queue.start()
+            # ملفات مؤقتة تركتها عقد متوقفة
+            self.queue.sweep(self.output_dir)
+            self.queue.sweep(self.renamed_dir)
+        else:
+            # 1. تحميل نموذج Whisper
+            if not self.load_whisper_model():
+                return
+            
+            # 2. إعادة تسمية الملفات
+            work_items = self.rename_audio_files()
+            if not work_items:
+                return
         
         print("\n" + "=" * 60)
         print("🎤 بدء عملية الترانسكربت...")
         
         success_count = 0
+        skipped_count = 0
         failed_files = []
-        total_files = len(renamed_files)
+        total_files = len(work_items)
         
         # 3. ترانسكربت كل ملف
-        for i, (file_path, sample_name) in enumerate(renamed_files, 1):
-            print(f"\n🔄 [{i}/{total_files}] معالجة: {sample_name}")
-            
-            # ترانسكربت الملف
-            transcript_data = self.transcribe_with_timestamps(file_path, sample_name)
-            
-            if transcript_data:
-                # حفظ JSON
-                json_path = self.save_transcript_json(transcript_data, sample_name)
+        try:
+            for i, (source_file, sample_name) in enumerate(work_items, 1):
+                # مفتاح الحجز هو اسم الملف المصدر، مثل AudioCleaner
+                key = os.path.basename(source_file)
+                guard = None
+                if self.queue:
+                    if not self.queue.claim(key):
+                        skipped_count += 1
+                        continue
+                    if self.model is None and not self.load_whisper_model():
+                        self.queue.release(key)
+                        break
+                    guard = self.queue.guard(key)
+                
+                print(f"\n🔄 [{i}/{total_files}] معالجة: {sample_name}")
+                
+                try:
+                    if self.queue:
+                        file_path = self.copy_renamed(source_file, sample_name, guard)
+                    else:
+                        file_path = os.path.join(self.renamed_dir, sample_name)
+                    
+                    # ترانسكربت الملف
+                    transcript_data = self.transcribe_with_timestamps(file_path, sample_name)
+                    
+                    # حفظ JSON
+                    json_path = self.save_transcript_json(transcript_data, sample_name, guard) \
+                        if transcript_data else None
+                    if json_path and self.queue and not self.queue.complete(key):
+                        raise LeaseLost(key)
+                except LeaseLost:
+                    # استرجعت عقدة أخرى الملف - هي المسؤولة عنه الآن
+                    print("   ⚠️ فُقد الحجز - تم تجاهل الناتج")
+                    self.queue.release(key)
+                    skipped_count += 1
+                    continue
+                except OSError as e:
+                    # خطأ في الملفات (مثلاً حُذف الملف المؤقت) يُفشل هذا الملف فقط
+                    print(f"   ❌ خطأ في ملفات {sample_name}: {e}")
+                    failed_files.append(sample_name)
+                    if self.queue:
+                        self.queue.release(key)
+                    continue
                 
                 if json_path:
                     success_count += 1
@@ -180,14 +272,19 @@ class WhisperTranscriber:
                     print(f"   ⏱️ المدة: {transcript_data['metadata']['total_duration']:.1f} ثانية")
                 else:
                     failed_files.append(sample_name)
-            else:
-                failed_files.append(sample_name)
+                    if self.queue:
+                        self.queue.release(key)
+        finally:
+            if self.queue:
+                self.queue.close()
         
         # 4. تقرير النتائج النهائي
         print("\n" + "=" * 60)
         print("📊 تقرير الترانسكربت النهائي:")
         print(f"✅ نجح: {success_count}")
         print(f"❌ فشل: {len(failed_files)}")
+        if self.queue:
+            print(f"⏭️ تمت معالجتها أو محجوزة من عقد أخرى: {skipped_count}")
         print(f"📁 الملفات الصوتية المعاد تسميتها: {os.path.abspath(self.renamed_dir)}")
         print(f"📁 ملفات الترانسكربت JSON: {os.path.abspath(self.output_dir)}")
         
@@ -206,7 +303,12 @@ class WhisperTranscriber:
 
 def main():
     """الدالة الرئيسية"""
-    transcriber = WhisperTranscriber()
+    parser = argparse.ArgumentParser(description="ترانسكربت الملفات الصوتية باستخدام Whisper")
+    add_distributed_arguments(parser)
+    args = parser.parse_args()
+    
+    transcriber = WhisperTranscriber(distributed=args.distributed, worker_id=args.worker_id,
+                                     lease_ttl=args.lease_ttl)
     transcriber.process_all_files()
 
 if __name__ == "__main__":
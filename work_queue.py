@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Distributed Work Queue over a Shared Filesystem (lease files)
+طابور عمل موزع عبر مجلد مشترك (NFS) باستخدام ملفات الحجز
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import hashlib
+import threading
+from contextlib import contextmanager
+
+DEFAULT_LEASE_TTL = 300  # ثانية - يجب أن تتجاوز فرق الساعة بين العقد
+TEMP_PREFIX = ".tmp_"
+
+
+def default_worker_id():
+    """معرّف فريد للعقدة والعملية"""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class LeaseLost(Exception):
+    """الحجز لم يعد لهذه العقدة (استرجعته عقدة أخرى) فيُهمل الناتج"""
+
+
+@contextmanager
+def atomic_output(final_path, guard=None):
+    """
+    كتابة الملف في مسار مؤقت ثم إعادة تسميته ذرياً إلى المسار النهائي.
+    إذا أعادت `guard` القيمة False قبل إعادة التسمية يُحذف الملف المؤقت وتُرفع LeaseLost.
+    """
+    directory, name = os.path.split(final_path)
+    # نقطة في البداية حتى لا تلتقطه glob، مع الإبقاء على الامتداد لتحديد الصيغة.
+    # الاسم الأصلي لا يُضاف حتى لا يتجاوز الحد الأقصى لطول الاسم (255 بايت)
+    temp_path = os.path.join(directory, f"{TEMP_PREFIX}{uuid.uuid4().hex[:12]}{os.path.splitext(name)[1]}")
+    try:
+        yield temp_path
+        if guard is not None and not guard():
+            raise LeaseLost(final_path)
+        os.replace(temp_path, final_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def add_distributed_arguments(parser):
+    """خيارات الوضع الموزع المشتركة بين مراحل المعالجة"""
+    parser.add_argument("--distributed", action="store_true",
+                        help="توزيع الملفات على عدة عقد عبر مجلد مشترك")
+    parser.add_argument("--worker-id", default=None, help="معرّف العقدة (افتراضياً host-pid)")
+    parser.add_argument("--lease-ttl", type=float, default=DEFAULT_LEASE_TTL,
+                        help="مدة صلاحية الحجز بالثواني قبل استرجاعه")
+
+
+def lease_status(lease_dir, lease_ttl=DEFAULT_LEASE_TTL):
+    """إحصائيات الحجوزات في مجلد (بدون إنشائه): نشطة، منتهية، مكتملة"""
+    status = {"active": 0, "expired": 0, "done": 0}
+    if not os.path.isdir(lease_dir):
+        return status
+    now = time.time()
+    for name in os.listdir(lease_dir):
+        path = os.path.join(lease_dir, name)
+        if name.endswith(".done"):
+            status["done"] += 1
+        elif name.endswith(".lease"):
+            try:
+                expired = now - os.stat(path).st_mtime >= lease_ttl
+            except FileNotFoundError:
+                continue
+            status["expired" if expired else "active"] += 1
+    return status
+
+
+@contextmanager
+def exclusive_lock(lock_path, stale_after=DEFAULT_LEASE_TTL, poll=0.2):
+    """قفل بسيط بملف O_EXCL على المجلد المشترك، يُكسر إذا تجاوز عمره stale_after"""
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.stat(lock_path).st_mtime >= stale_after:
+                    os.remove(lock_path)
+                    continue
+            except FileNotFoundError:
+                continue
+            time.sleep(poll)
+    os.close(fd)
+    try:
+        yield
+    finally:
+        os.remove(lock_path)
+
+
+def sweep_orphans(directory, prefixes=(TEMP_PREFIX,), max_age=DEFAULT_LEASE_TTL):
+    """حذف الملفات المؤقتة التي تركتها عقد متوقفة (أقدم من max_age)"""
+    if not os.path.isdir(directory):
+        return 0
+    removed = 0
+    now = time.time()
+    for name in os.listdir(directory):
+        if not name.startswith(prefixes):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            if now - os.stat(path).st_mtime >= max_age:
+                os.remove(path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    if removed:
+        print(f"🧹 حذف {removed} ملف مؤقت متروك في: {directory}")
+    return removed
+
+
+def atomic_write_json(path, data, guard=None):
+    """حفظ JSON بشكل ذري (temp ثم rename)"""
+    with atomic_output(path, guard) as temp_path:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class LeaseQueue:
+    """
+    توزيع الملفات على عدة عقد بدون خدمة مركزية.
+
+    كل عنصر يُحجز بإنشاء ملف `<hash>.lease` بشكل حصري (O_EXCL)، وتُجدد
+    العقدة حجوزاتها دورياً (heartbeat) بتحديث وقت التعديل. الحجز الذي لم
+    يُجدد خلال `lease_ttl` يُعتبر لعقدة متوقفة ويمكن استرجاعه، وعند الانتهاء
+    يُكتب `<hash>.done` حتى لا يُعاد معالجة العنصر. `<hash>` بصمة قصيرة للمفتاح
+    (أسماء الملفات العربية الطويلة قد تتجاوز 255 بايت)، والمفتاح نفسه يُحفظ داخل JSON.
+    """
+
+    def __init__(self, lease_dir, worker_id=None, lease_ttl=DEFAULT_LEASE_TTL):
+        self.lease_dir = lease_dir
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_ttl = lease_ttl
+        self.held = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat_thread = None
+        os.makedirs(self.lease_dir, exist_ok=True)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @staticmethod
+    def _entry_name(key):
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+
+    def _lease_path(self, key):
+        return os.path.join(self.lease_dir, f"{self._entry_name(key)}.lease")
+
+    def _done_path(self, key):
+        return os.path.join(self.lease_dir, f"{self._entry_name(key)}.done")
+
+    def is_done(self, key):
+        """هل تمت معالجة العنصر من أي عقدة"""
+        return os.path.exists(self._done_path(key))
+
+    def _try_create(self, key):
+        """إنشاء ملف الحجز بشكل حصري - تنجح عقدة واحدة فقط"""
+        try:
+            fd = os.open(self._lease_path(key), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({"key": key, "worker": self.worker_id, "claimed_at": time.time()}, f,
+                      ensure_ascii=False)
+        return True
+
+    def _lease_owner(self, key):
+        try:
+            with open(self._lease_path(key), 'r', encoding='utf-8') as f:
+                return json.load(f).get("worker")
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _reclaim_if_expired(self, key):
+        """استرجاع حجز منتهي الصلاحية من عقدة متوقفة"""
+        lease_path = self._lease_path(key)
+        try:
+            age = time.time() - os.stat(lease_path).st_mtime
+        except FileNotFoundError:
+            return True
+        if age < self.lease_ttl:
+            return False
+
+        # rename ذري: عقدة واحدة فقط تنجح في نقل الحجز القديم
+        expired_path = f"{lease_path}.{uuid.uuid4().hex[:12]}.expired"
+        try:
+            os.rename(lease_path, expired_path)
+        except FileNotFoundError:
+            return True
+
+        try:
+            if time.time() - os.stat(expired_path).st_mtime < self.lease_ttl:
+                # تم تجديد الحجز أو إنشاؤه للتو من عقدة أخرى - نعيده كما كان
+                try:
+                    os.link(expired_path, lease_path)
+                except FileExistsError:
+                    pass
+                return False
+        finally:
+            os.remove(expired_path)
+
+        print(f"   ♻️ استرجاع حجز منتهي: {key}")
+        return True
+
+    def claim(self, key):
+        """محاولة حجز عنصر، ترجع True إذا أصبح لهذه العقدة"""
+        if self.is_done(key):
+            return False
+        claimed = self._try_create(key)
+        if not claimed and self._reclaim_if_expired(key):
+            claimed = self._try_create(key)
+        if claimed:
+            # قد تكون عقدة أخرى أنهت العنصر بين الفحص والحجز
+            if self.is_done(key):
+                os.remove(self._lease_path(key))
+                return False
+            with self._lock:
+                self.held.add(key)
+        return claimed
+
+    def owns(self, key):
+        """التأكد من أن الحجز ما زال لهذه العقدة"""
+        return key in self.held and self._lease_owner(key) == self.worker_id
+
+    def release(self, key):
+        """تحرير الحجز بدون تعليمه كمنتهي (ليُعاد المحاولة لاحقاً)"""
+        with self._lock:
+            self.held.discard(key)
+        if self._lease_owner(key) == self.worker_id:
+            try:
+                os.remove(self._lease_path(key))
+            except FileNotFoundError:
+                pass
+
+    def guard(self, key):
+        """دالة تُمرر إلى atomic_output للتحقق من الحجز قبل إعادة التسمية النهائية"""
+        return lambda: self.owns(key)
+
+    def complete(self, key):
+        """
+        تعليم العنصر كمنتهي ثم تحرير الحجز.
+        ترجع False دون كتابة `.done` إذا استرجعت عقدة أخرى الحجز.
+        """
+        if not self.owns(key):
+            with self._lock:
+                self.held.discard(key)
+            return False
+        atomic_write_json(self._done_path(key), {
+            "key": key,
+            "worker": self.worker_id,
+            "completed_at": time.time()
+        })
+        self.release(key)
+        return True
+
+    def heartbeat(self):
+        """تجديد جميع الحجوزات الحالية"""
+        with self._lock:
+            keys = list(self.held)
+        for key in keys:
+            if self._lease_owner(key) != self.worker_id:
+                print(f"   ⚠️ فُقد الحجز: {key}")
+                with self._lock:
+                    self.held.discard(key)
+                continue
+            try:
+                os.utime(self._lease_path(key), None)
+            except FileNotFoundError:
+                pass
+
+    def _heartbeat_loop(self):
+        interval = max(self.lease_ttl / 3, 0.1)
+        while not self._stop.wait(interval):
+            self.heartbeat()
+
+    def sweep(self, directory, prefixes=(TEMP_PREFIX,)):
+        """حذف الملفات المؤقتة المتروكة الأقدم من مدة صلاحية الحجز"""
+        return sweep_orphans(directory, prefixes, self.lease_ttl)
+
+    def start(self):
+        """تشغيل خيط التجديد الدوري وتنظيف ملفات الحجز المؤقتة المتروكة"""
+        self.sweep(self.lease_dir)
+        if self._heartbeat_thread is None:
+            self._stop.clear()
+            self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
+            self._heartbeat_thread.start()
+
+    def close(self):
+        """إيقاف التجديد وتحرير الحجوزات المتبقية"""
+        self._stop.set()
+        if self._heartbeat_thread is not None:
+            self._heartbeat_thread.join()
+            self._heartbeat_thread = None
+        for key in list(self.held):
+            self.release(key)